@@ -1,27 +1,45 @@
-import json
+import functools
+import itertools
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy import signal
+from scipy.fft import rfft, next_fast_len
 from datetime import datetime
-import os
+from concurrent.futures import ThreadPoolExecutor
 import argparse
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    # orjson is optional; the stdlib parser accepts the same bytes input
+    from json import loads as _json_loads
+
 
 def load_data(file_path):
     """Load vital signs data from JSON file."""
-    with open(file_path, 'r') as file:
-        data = json.load(file)
+    with open(file_path, 'rb') as file:
+        data = _json_loads(file.read())
     return data
 
 
-def calculate_actual_sampling_rate(data):
-    """Calculate the actual sampling rate from metadata."""
-    try:
-        # Get start and end times from metadata
+def get_recording_times(data):
+    """Return the recording start and end times from metadata.
+
+    The ISO timestamps are parsed once and cached on the data dict.
+    """
+    if '_parsed_end' not in data:
         start_time = datetime.fromisoformat(
             data['metadata']['startTime'].replace('Z', '+00:00'))
         end_time = datetime.fromisoformat(
             data['metadata']['endTime'].replace('Z', '+00:00'))
+        data['_parsed_start'], data['_parsed_end'] = start_time, end_time
+    return data['_parsed_start'], data['_parsed_end']
+
+
+def calculate_actual_sampling_rate(data):
+    """Calculate the actual sampling rate from metadata."""
+    try:
+        # Get start and end times from metadata
+        start_time, end_time = get_recording_times(data)
 
         # Calculate duration in seconds
         duration = (end_time - start_time).total_seconds()
@@ -45,235 +63,235 @@ def calculate_actual_sampling_rate(data):
         return data['metadata'].get('samplingRate', 30)
 
 
-def apply_butterworth_bandpass(signal_data, fs, lowcut, highcut, order=4):
-    """Apply Butterworth bandpass filter to the signal."""
+@functools.lru_cache(maxsize=32)
+def _design_bandpass(order, fs, lowcut, highcut):
+    """Design (and memoize) a Butterworth bandpass filter as second-order sections.
+
+    The design is done in float64. Returns the sections in float64 and
+    rounded to float32 (for float32 signals, which sosfiltfilt would
+    otherwise promote to float64), together with the edge padding length
+    sosfiltfilt would otherwise recompute on every call.
+    """
     nyquist = 0.5 * fs
     low = lowcut / nyquist
     high = highcut / nyquist
-    b, a = signal.butter(order, [low, high], btype='band')
-    return signal.filtfilt(b, a, signal_data)
+    sos = signal.butter(order, [low, high], btype='band', output='sos')
+
+    # Same default as sosfiltfilt: 3 * (number of filter taps)
+    ntaps = 2 * len(sos) + 1 - min((sos[:, 2] == 0).sum(), (sos[:, 5] == 0).sum())
+    return sos, sos.astype(np.float32), 3 * int(ntaps)
+
+
+def apply_butterworth_bandpass(signal_data, fs, lowcut, highcut, order=4):
+    """Apply Butterworth bandpass filter to the signal."""
+    sos, sos32, padlen = _design_bandpass(order, fs, lowcut, highcut)
+    if signal_data.dtype == np.float32:
+        sos = sos32
+    # Shorten the edge padding for signals shorter than the default pad
+    padlen = min(padlen, len(signal_data) - 1)
+    return signal.sosfiltfilt(sos, signal_data, padlen=padlen)
+
+
+def _find_peaks_scipy(power, threshold):
+    """Find local maxima of power above threshold; returns (indices, powers)."""
+    peak_idx, props = signal.find_peaks(power, height=threshold)
+    return peak_idx, props['peak_heights']
+
+
+def _find_peaks_loop(power, threshold):
+    """Find local maxima of power above threshold; returns (indices, powers).
+
+    Plain loop version of _find_peaks_scipy, compiled by use_numba().
+    """
+    n = len(power)
+    idx_buf = np.empty(max(n - 2, 0), dtype=np.int64)
+    pow_buf = np.empty(max(n - 2, 0), dtype=np.float64)
+    k = 0
+    for i in range(1, n - 1):
+        if (power[i] > power[i-1] and
+            power[i] > power[i+1] and
+                power[i] > threshold):
+            idx_buf[k] = i
+            pow_buf[k] = power[i]
+            k += 1
+    return idx_buf[:k], pow_buf[:k]
+
+
+# Peak scan used by find_dominant_frequency; use_numba() swaps in the
+# compiled loop
+_find_peaks = _find_peaks_scipy
+
 
+def use_numba():
+    """Run the peak scan as a Numba-compiled loop from now on.
 
-def find_dominant_frequency(fft_result, fs, min_freq, max_freq):
-    """Find the dominant frequency in the specified range with harmonic detection."""
+    Opt-in (--numba): on typical spectra the scan takes microseconds, far less
+    than importing Numba and loading the compiled kernel.
+    """
+    global _find_peaks
+    # Imported here so that only runs which ask for it pay for importing numba
+    from numba import njit
+    _find_peaks = njit(cache=True, fastmath=True)(_find_peaks_loop)
+
+
+def _hps_peak_index(fft_result, min_idx, max_idx, harmonics=3):
+    """Locate the fundamental in [min_idx, max_idx) with a harmonic product spectrum.
+
+    Returns the spectrum index of the HPS maximum.
+    """
+    power = fft_result.real**2 + fft_result.imag**2
+
+    # Only use harmonics whose bins all fall inside the spectrum
+    harmonics = min(harmonics, (len(power) - 1) // max(max_idx - 1, 1))
+
+    hps = power[min_idx:max_idx].astype(np.float64)
+    for h in range(2, harmonics + 1):
+        hps *= power[h * min_idx:h * max_idx:h]
+
+    return np.argmax(hps) + min_idx
+
+
+def find_dominant_frequency(fft_result, fs, min_freq, max_freq, n, method='peaks'):
+    """Find the dominant frequency in the specified range with harmonic detection.
+
+    fft_result is the one-sided spectrum returned by rfft; n is the length of
+    the transformed signal (the n_fft from compute_spectrum). It is required
+    because it cannot be recovered from the spectrum: fast FFT lengths may be
+    odd, and an odd n gives the same number of rfft bins as n - 1.
+    method='hps' uses a harmonic product spectrum to pick the fundamental and
+    falls back to the default peak/harmonic-ratio search if that fundamental
+    is not a significant peak itself.
+    """
     # Calculate frequency resolution
-    n = len(fft_result)
     freq_resolution = fs / n
 
     # Find indices corresponding to the frequency range
     min_idx = max(1, int(min_freq / freq_resolution))
-    max_idx = min(int(max_freq / freq_resolution), n // 2)
+    max_idx = min(int(max_freq / freq_resolution), len(fft_result))
 
-    # Extract power spectrum in the frequency range
-    power_spectrum = np.abs(fft_result[min_idx:max_idx])**2
+    # Extract power spectrum in the frequency range (|X|^2 without the
+    # square root taken by np.abs)
+    band = fft_result[min_idx:max_idx]
+    power_spectrum = band.real**2 + band.imag**2
 
     # If no valid data, return 0
     if len(power_spectrum) == 0:
         return 0
 
-    # Create an array of all frequencies in our range
-    frequencies = np.arange(min_idx, max_idx) * freq_resolution
+    if method == 'hps':
+        # Only trust the HPS fundamental if it carries real power itself (at
+        # least 10% of the band maximum); otherwise the product is dominated
+        # by a single strong peak and points an octave too low
+        peak_idx = _hps_peak_index(fft_result, min_idx, max_idx)
+        if power_spectrum[peak_idx - min_idx] > 0.1 * np.max(power_spectrum):
+            return peak_idx * freq_resolution
 
     # Find all significant peaks in the power spectrum
     # A peak must be at least 20% of the maximum power in the range
-    threshold = 0.2 * np.max(power_spectrum)
-    peaks = []
-
-    for i in range(1, len(power_spectrum) - 1):
-        if (power_spectrum[i] > power_spectrum[i-1] and
-            power_spectrum[i] > power_spectrum[i+1] and
-                power_spectrum[i] > threshold):
-            peaks.append({
-                'idx': i + min_idx,
-                'freq': frequencies[i],
-                'power': power_spectrum[i]
-            })
-
-    # Sort peaks by power
-    peaks.sort(key=lambda x: x['power'], reverse=True)
-
-    if not peaks:
+    threshold = 0.2 * float(np.max(power_spectrum))
+    peak_idx, peak_power = _find_peaks(power_spectrum, threshold)
+
+    if len(peak_idx) == 0:
         # No peaks found, use the maximum power approach as fallback
         peak_idx = np.argmax(power_spectrum) + min_idx
         return peak_idx * freq_resolution
 
-    dominant_peak = peaks[0]
+    peak_freq = (peak_idx + min_idx) * freq_resolution
+    top = np.argmax(peak_power)
+    dominant_freq = peak_freq[top]
 
-    # Check if the most powerful peak might be a harmonic
-    if len(peaks) > 1:
-        # Look at other strong peaks
-        for peak in peaks[1:]:
-            # Check if this peak could be the fundamental frequency of the dominant peak
-            ratio = dominant_peak['freq'] / peak['freq']
+    # Check if the most powerful peak might be a harmonic: look for strong
+    # peaks at approximately half the dominant frequency
+    ratio = dominant_freq / peak_freq
+    fundamental = ((ratio > 1.9) & (ratio < 2.1) &
+                   (peak_power > 0.3 * peak_power[top]))
 
-            # If the dominant frequency is approximately double of another peak
-            if 1.9 < ratio < 2.1 and peak['power'] > 0.3 * dominant_peak['power']:
-                print(
-                    f"Detected harmonic: {dominant_peak['freq']:.2f}Hz is likely 2x of {peak['freq']:.2f}Hz")
-                # Return the lower frequency (fundamental)
-                return peak['freq']
+    if fundamental.any():
+        # Return the lower frequency (fundamental), strongest candidate first
+        candidates = np.flatnonzero(fundamental)
+        freq = peak_freq[candidates[np.argmax(peak_power[candidates])]]
+        print(
+            f"Detected harmonic: {dominant_freq:.2f}Hz is likely 2x of {freq:.2f}Hz")
+        return freq
 
     # If no harmonic relationship found, return the dominant frequency
-    return dominant_peak['freq']
+    return dominant_freq
+
+
+@functools.lru_cache(maxsize=8)
+def _hamming(n):
+    """Return a (shared, read-only) Hamming window of length n."""
+    window = signal.windows.hamming(n)
+    window.flags.writeable = False
+    return window
+
 
+def compute_spectrum(signal_data):
+    """Compute the one-sided spectrum of a Hamming-windowed signal.
 
-def calculate_heart_rate(signal_data, fs):
-    """Calculate heart rate from BVP signal using FFT."""
-    # Apply window to reduce spectral leakage
-    windowed = signal.windows.hamming(len(signal_data)) * signal_data
+    Works along the last axis, so several equal-length signals stacked as rows
+    are transformed in a single batched FFT. The signal is zero-padded to a
+    fast FFT length; returns the spectrum together with that length.
+    """
+    n = signal_data.shape[-1]
+    n_fft = next_fast_len(n, real=True)
 
-    # Compute FFT
-    fft_result = np.fft.fft(windowed)
+    # Apply window to reduce spectral leakage, writing straight into the
+    # zero-padded FFT input so no separate windowed/padded copies are made.
+    # float32 signals stay float32 (and give a complex64 spectrum).
+    buf = np.zeros(signal_data.shape[:-1] + (n_fft,),
+                   dtype=np.result_type(signal_data, np.float32))
+    np.multiply(_hamming(n), signal_data, out=buf[..., :n])
+
+    # Compute FFT (real input, so only the positive half is needed)
+    return rfft(buf, overwrite_x=True, workers=-1), n_fft
+
+
+def calculate_heart_rate(signal_data, fs, spectrum=None, method='peaks'):
+    """Calculate heart rate from BVP signal using FFT.
+
+    spectrum may be a precomputed (fft_result, n_fft) pair from compute_spectrum;
+    method is passed on to find_dominant_frequency.
+    """
+    fft_result, n_fft = spectrum if spectrum is not None else compute_spectrum(
+        signal_data)
 
     # Heart rate frequency range: 0.6-3.3 Hz (36-198 BPM)
-    dominant_freq = find_dominant_frequency(fft_result, fs, 0.6, 3.3)
+    dominant_freq = find_dominant_frequency(
+        fft_result, fs, 0.6, 3.3, n=n_fft, method=method)
 
     # Convert frequency to BPM
     return dominant_freq * 60
 
 
-def calculate_respiratory_rate(signal_data, fs):
-    """Calculate respiratory rate from respiratory signal using FFT."""
-    # Apply window to reduce spectral leakage
-    windowed = signal.windows.hamming(len(signal_data)) * signal_data
+def calculate_respiratory_rate(signal_data, fs, spectrum=None, method='peaks'):
+    """Calculate respiratory rate from respiratory signal using FFT.
 
-    # Compute FFT
-    fft_result = np.fft.fft(windowed)
+    spectrum may be a precomputed (fft_result, n_fft) pair from compute_spectrum;
+    method is passed on to find_dominant_frequency.
+    """
+    fft_result, n_fft = spectrum if spectrum is not None else compute_spectrum(
+        signal_data)
 
     # Respiratory rate frequency range: 0.1-0.54 Hz (6-32 breaths/minute)
-    dominant_freq = find_dominant_frequency(fft_result, fs, 0.1, 0.54)
+    dominant_freq = find_dominant_frequency(
+        fft_result, fs, 0.1, 0.54, n=n_fft, method=method)
 
     # Convert frequency to breaths per minute
     return dominant_freq * 60
 
 
-def remove_dc(signal_data):
-    """Remove DC component from the signal."""
-    return signal_data - np.mean(signal_data)
-
-
-def plot_signals(data, bvp_filtered, resp_filtered, hr, rr, actual_fs, file_path="data/sample_data.json"):
-    """Plot raw and filtered signals with computed heart and respiratory rates."""
-    sampling_rate = data['metadata']['samplingRate']  # Nominal sampling rate
-    samples = len(data['signals']['bvp']['raw'])
-
-    start_time = datetime.fromisoformat(
-        data['metadata']['startTime'].replace('Z', '+00:00'))
-    # end_time = datetime.fromisoformat(
-    #     data['metadata']['endTime'].replace('Z', '+00:00'))
-    # duration = (end_time - start_time).total_seconds()
-    duration = samples / actual_fs
-
-    # Create time arrays
-
-    time = np.linspace(0, duration, samples)
-
-    # Create plot figure
-    plt.figure(figsize=(15, 10))
-
-    # Plot BVP signals
-    plt.subplot(2, 1, 1)
-    plt.plot(time, data['signals']['bvp']['raw'],
-             'b-', alpha=0.5, label='Raw BVP')
-    plt.plot(time, bvp_filtered, 'r-', label='Filtered BVP')
-    plt.title(f'Blood Volume Pulse (BVP) - Computed HR: {hr:.1f} BPM')
-    plt.xlabel('Time (s)')
-    plt.ylabel('Amplitude')
-    plt.grid(True)
-    plt.legend()
-
-    # Add metadata annotation with actual sampling rate
-    plt.annotate(f'Start Time: {start_time.strftime("%Y-%m-%d %H:%M:%S")}\n'
-                 f'Duration: {duration:.2f} s\n'
-                 f'Nominal Sampling Rate: {sampling_rate} Hz\n'
-                 f'Actual Sampling Rate: {actual_fs:.2f} Hz\n'
-                 f'Samples: {samples}',
-                 xy=(0.02, 0.02), xycoords='axes fraction',
-                 bbox=dict(boxstyle="round,pad=0.5", fc="white", alpha=0.8))
-
-    # Plot Respiratory signals
-    plt.subplot(2, 1, 2)
-    plt.plot(time, data['signals']['resp']['raw'],
-             'b-', alpha=0.5, label='Raw Resp')
-    plt.plot(time, resp_filtered, 'r-', label='Filtered Resp')
-    plt.title(f'Respiratory Signal - Computed RR: {rr:.1f} breaths/min')
-    plt.xlabel('Time (s)')
-    plt.ylabel('Amplitude')
-    plt.grid(True)
-    plt.legend()
-
-    # Adjust layout and save plot
-    plt.tight_layout()
-    output_dir = os.path.dirname(file_path)
-    output_file = os.path.join(output_dir, 'vital_signs_analysis.png')
-    plt.savefig(output_file)
-    plt.show()
-
-    print(f"Analysis complete. Plot saved to {output_file}")
-    print(f"Computed Heart Rate: {hr:.1f} BPM")
-    print(f"Computed Respiratory Rate: {rr:.1f} breaths/min")
-
-
-def plot_frequency_spectrum(signal_data, fs, title, y_label, min_freq=0, max_freq=None, file_path="data/sample_data.json"):
-    """Plot the frequency spectrum of a signal with x-axis in BPM or breaths/min."""
-    # Apply window to reduce spectral leakage
-    windowed = signal.windows.hamming(len(signal_data)) * signal_data
-
-    # Compute FFT
-    fft_result = np.fft.fft(windowed)
-
-    # Compute frequency array
-    n = len(fft_result)
-    freq = np.fft.fftfreq(n, 1/fs)
-
-    # Convert frequency to rate (BPM or breaths/min)
-    rate = freq * 60
-
-    # Plot only the positive frequency components up to max_freq
-    positive_mask = freq > 0
-    if max_freq:
-        positive_mask = (freq > 0) & (freq <= max_freq)
-
-    plt.figure(figsize=(10, 6))
-    plt.plot(rate[positive_mask], np.abs(fft_result)[positive_mask])
-
-    # Set appropriate title and labels based on signal type
-    if title == 'BVP':
-        plt.title(f'Heart Rate Spectrum - {title} (Actual FS: {fs:.2f} Hz)')
-        plt.xlabel('Heart Rate (BPM)')
-    elif title == 'Respiratory':
-        plt.title(
-            f'Respiratory Rate Spectrum - {title} (Actual FS: {fs:.2f} Hz)')
-        plt.xlabel('Respiratory Rate (breaths/min)')
-    else:
-        plt.title(f'Frequency Spectrum - {title}')
-        plt.xlabel('Rate (per minute)')
-
-    plt.ylabel(y_label)
-    plt.grid(True)
-
-    # Mark the min and max frequency search ranges (converted to rate)
-    if title == 'BVP':
-        plt.axvline(x=0.6 * 60, color='g', linestyle='--',
-                    label='Min HR (36 BPM)')
-        plt.axvline(x=3.3 * 60, color='r', linestyle='--',
-                    label='Max HR (198 BPM)')
-    elif title == 'Respiratory':
-        plt.axvline(x=0.1 * 60, color='g', linestyle='--',
-                    label='Min RR (6 breaths/min)')
-        plt.axvline(x=0.54 * 60, color='r', linestyle='--',
-                    label='Max RR (32 breaths/min)')
-
-    plt.legend()
-
-    # Save plot
-    output_dir = os.path.dirname(file_path)
-    output_file = os.path.join(
-        output_dir, f'{title.lower()}_frequency_spectrum.png')
-    plt.savefig(output_file)
-
-
-def main(file_path, sampling_rate_override=None):
+def remove_dc(signal_data, out=None):
+    """Remove DC component from the signal.
+
+    Works along the last axis, so stacked signals are handled in one pass.
+    Pass out=signal_data to subtract the mean in place without allocating.
+    """
+    return np.subtract(signal_data, np.mean(signal_data, axis=-1, keepdims=True),
+                       out=out)
+
+
+def main(file_path, sampling_rate_override=None, plot=True, method='peaks'):
     # Load the JSON data
     data = load_data(file_path)
 
@@ -283,41 +301,77 @@ def main(file_path, sampling_rate_override=None):
     # Use override if provided, otherwise use calculated actual rate
     sampling_rate = sampling_rate_override if sampling_rate_override else actual_sampling_rate
 
-    # Extract signals and metadata
-    bvp_raw = np.array(data['signals']['bvp']['raw'])
-    resp_raw = np.array(data['signals']['resp']['raw'])
-
-    # Remove DC component
-    bvp_dc_removed = remove_dc(bvp_raw)
-    resp_dc_removed = remove_dc(resp_raw)
-
-    # Apply Butterworth bandpass filter with actual sampling rate
-    # Heart rate: 0.6-3.3 Hz (36-198 BPM)
-    bvp_filtered = apply_butterworth_bandpass(
-        bvp_dc_removed, sampling_rate, 0.6, 3.3)
-
-    # Respiratory rate: 0.1-0.54 Hz (6-32 breaths/minute)
-    resp_filtered = apply_butterworth_bandpass(
-        resp_dc_removed, sampling_rate, 0.1, 0.54)
+    # Extract signals; BVP and respiratory signals are recorded together (same
+    # length), so they are kept as the two rows of one array. np.fromiter with
+    # a known count skips np.array's nested-list shape and dtype discovery.
+    bvp_raw = data['signals']['bvp']['raw']
+    resp_raw = data['signals']['resp']['raw']
+    if len(bvp_raw) != len(resp_raw):
+        raise ValueError("BVP and respiratory signals differ in length")
+    raw = np.fromiter(itertools.chain(bvp_raw, resp_raw), dtype=np.float32,
+                      count=2 * len(bvp_raw)).reshape(2, -1)
+
+    # Remove DC component from both signals in a single in-place pass
+    remove_dc(raw, out=raw)
+
+    # Apply Butterworth bandpass filter with actual sampling rate. The two
+    # signals are independent and scipy's SOS filter releases the GIL, so they
+    # are filtered concurrently; the FFT below is already multithreaded and
+    # stays on this thread.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Heart rate: 0.6-3.3 Hz (36-198 BPM)
+        bvp_future = executor.submit(
+            apply_butterworth_bandpass, raw[0], sampling_rate, 0.6, 3.3)
+
+        # Respiratory rate: 0.1-0.54 Hz (6-32 breaths/minute)
+        resp_future = executor.submit(
+            apply_butterworth_bandpass, raw[1], sampling_rate, 0.1, 0.54)
+
+        bvp_filtered = bvp_future.result()
+        resp_filtered = resp_future.result()
+
+    # Compute both spectra once, in a single batched FFT, and share them
+    # between rate estimation and plotting
+    spectra, n_fft = compute_spectrum(np.vstack([bvp_filtered, resp_filtered]))
+    bvp_spectrum = (spectra[0], n_fft)
+    resp_spectrum = (spectra[1], n_fft)
 
     # Calculate heart rate and respiratory rate using FFT with actual sampling rate
-    hr = calculate_heart_rate(bvp_filtered, sampling_rate)
-    rr = calculate_respiratory_rate(resp_filtered, sampling_rate)
-
-    # Plot frequency spectrums with actual sampling rate
-    plot_frequency_spectrum(bvp_filtered, sampling_rate,
-                            'BVP', 'Magnitude', max_freq=5, file_path=file_path)
-    plot_frequency_spectrum(resp_filtered, sampling_rate,
-                            'Respiratory', 'Magnitude', max_freq=1, file_path=file_path)
-
-    # Plot signals and results
-    plot_signals(data, bvp_filtered, resp_filtered,
-                 hr, rr, sampling_rate, file_path=file_path)
+    hr = calculate_heart_rate(
+        bvp_filtered, sampling_rate, spectrum=bvp_spectrum, method=method)
+    rr = calculate_respiratory_rate(
+        resp_filtered, sampling_rate, spectrum=resp_spectrum, method=method)
+
+    if plot:
+        # Imported lazily: matplotlib dominates start-up time. The relative
+        # form covers package imports, the absolute one running as a script
+        try:
+            from .process_data_plots import plot_frequency_spectrum, plot_signals
+        except ImportError:
+            from process_data_plots import plot_frequency_spectrum, plot_signals
+
+        # Plot frequency spectrums with actual sampling rate
+        plot_frequency_spectrum(bvp_spectrum, sampling_rate,
+                                'BVP', 'Magnitude', max_freq=5, file_path=file_path)
+        plot_frequency_spectrum(resp_spectrum, sampling_rate,
+                                'Respiratory', 'Magnitude', max_freq=1, file_path=file_path)
+
+        # Plot signals and results
+        start_time, _ = get_recording_times(data)
+        plot_signals(data, bvp_filtered, resp_filtered,
+                     hr, rr, sampling_rate, start_time, file_path=file_path)
+    else:
+        print(f"Computed Heart Rate: {hr:.1f} BPM")
+        print(f"Computed Respiratory Rate: {rr:.1f} breaths/min")
 
     # Compare with values in the JSON file
     # Calculate median heart rate and respiratory rate from the JSON data
-    hr_values = [point['value'] for point in data['rates']['heart']]
-    rr_values = [point['value'] for point in data['rates']['respiratory']]
+    heart_rates = data['rates']['heart']
+    resp_rates = data['rates']['respiratory']
+    hr_values = np.fromiter((point['value'] for point in heart_rates),
+                            dtype=np.float64, count=len(heart_rates))
+    rr_values = np.fromiter((point['value'] for point in resp_rates),
+                            dtype=np.float64, count=len(resp_rates))
 
     median_hr = np.median(hr_values)
     median_rr = np.median(rr_values)
@@ -344,9 +398,19 @@ if __name__ == "__main__":
                         help='Path to the JSON file containing vital signs data')
     parser.add_argument('--sampling_rate', type=int,
                         help='Override sampling rate in Hz (optional)')
+    parser.add_argument('--no-plot', action='store_true',
+                        help='Only compute the rates; skip plotting (and importing matplotlib)')
+    parser.add_argument('--method', choices=['peaks', 'hps'], default='peaks',
+                        help='Dominant frequency estimator: peak search with harmonic check '
+                             '(default) or harmonic product spectrum')
+    parser.add_argument('--numba', action='store_true',
+                        help='Compile the spectral peak scan with Numba (requires numba)')
 
     # Parse arguments
     args = parser.parse_args()
+    if args.numba:
+        use_numba()
 
     # Run main function with the provided file path
-    main(args.file_path, args.sampling_rate)
+    main(args.file_path, args.sampling_rate,
+         plot=not args.no_plot, method=args.method)
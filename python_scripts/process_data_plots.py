@@ -0,0 +1,128 @@
+"""Plotting helpers for process_data.py.
+
+Kept in a separate module so that matplotlib is only imported when plots are
+actually requested.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.fft import rfftfreq
+import os
+
+
+def plot_signals(data, bvp_filtered, resp_filtered, hr, rr, actual_fs, start_time, file_path="data/sample_data.json"):
+    """Plot raw and filtered signals with computed heart and respiratory rates.
+
+    start_time is the recording start (a datetime), shown in the annotation.
+    """
+    sampling_rate = data['metadata']['samplingRate']  # Nominal sampling rate
+    samples = len(data['signals']['bvp']['raw'])
+
+    duration = samples / actual_fs
+
+    # Create time arrays
+
+    time = np.linspace(0, duration, samples)
+
+    # Create plot figure
+    plt.figure(figsize=(15, 10))
+
+    # Plot BVP signals
+    plt.subplot(2, 1, 1)
+    plt.plot(time, data['signals']['bvp']['raw'],
+             'b-', alpha=0.5, label='Raw BVP')
+    plt.plot(time, bvp_filtered, 'r-', label='Filtered BVP')
+    plt.title(f'Blood Volume Pulse (BVP) - Computed HR: {hr:.1f} BPM')
+    plt.xlabel('Time (s)')
+    plt.ylabel('Amplitude')
+    plt.grid(True)
+    plt.legend()
+
+    # Add metadata annotation with actual sampling rate
+    plt.annotate(f'Start Time: {start_time.strftime("%Y-%m-%d %H:%M:%S")}\n'
+                 f'Duration: {duration:.2f} s\n'
+                 f'Nominal Sampling Rate: {sampling_rate} Hz\n'
+                 f'Actual Sampling Rate: {actual_fs:.2f} Hz\n'
+                 f'Samples: {samples}',
+                 xy=(0.02, 0.02), xycoords='axes fraction',
+                 bbox=dict(boxstyle="round,pad=0.5", fc="white", alpha=0.8))
+
+    # Plot Respiratory signals
+    plt.subplot(2, 1, 2)
+    plt.plot(time, data['signals']['resp']['raw'],
+             'b-', alpha=0.5, label='Raw Resp')
+    plt.plot(time, resp_filtered, 'r-', label='Filtered Resp')
+    plt.title(f'Respiratory Signal - Computed RR: {rr:.1f} breaths/min')
+    plt.xlabel('Time (s)')
+    plt.ylabel('Amplitude')
+    plt.grid(True)
+    plt.legend()
+
+    # Adjust layout and save plot
+    plt.tight_layout()
+    output_dir = os.path.dirname(file_path)
+    output_file = os.path.join(output_dir, 'vital_signs_analysis.png')
+    plt.savefig(output_file)
+    plt.show()
+
+    print(f"Analysis complete. Plot saved to {output_file}")
+    print(f"Computed Heart Rate: {hr:.1f} BPM")
+    print(f"Computed Respiratory Rate: {rr:.1f} breaths/min")
+
+
+def plot_frequency_spectrum(spectrum, fs, title, y_label, min_freq=0, max_freq=None, file_path="data/sample_data.json"):
+    """Plot the frequency spectrum of a signal with x-axis in BPM or breaths/min.
+
+    spectrum is the (fft_result, n_fft) pair returned by compute_spectrum.
+    """
+    fft_result, n_fft = spectrum
+
+    # Compute frequency array; rfftfreq is sorted, so the max_freq cutoff is
+    # a single slice bound rather than a boolean mask
+    freq = rfftfreq(n_fft, 1/fs)
+    cut = np.searchsorted(freq, max_freq, side='right') if max_freq else len(freq)
+
+    # Drop the DC bin and keep the components up to max_freq
+    freq = freq[1:cut]
+    spectrum_values = fft_result[1:cut]
+
+    # Convert frequency to rate (BPM or breaths/min)
+    rate = freq * 60
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(rate, np.abs(spectrum_values))
+
+    # Set appropriate title and labels based on signal type
+    if title == 'BVP':
+        plt.title(f'Heart Rate Spectrum - {title} (Actual FS: {fs:.2f} Hz)')
+        plt.xlabel('Heart Rate (BPM)')
+    elif title == 'Respiratory':
+        plt.title(
+            f'Respiratory Rate Spectrum - {title} (Actual FS: {fs:.2f} Hz)')
+        plt.xlabel('Respiratory Rate (breaths/min)')
+    else:
+        plt.title(f'Frequency Spectrum - {title}')
+        plt.xlabel('Rate (per minute)')
+
+    plt.ylabel(y_label)
+    plt.grid(True)
+
+    # Mark the min and max frequency search ranges (converted to rate)
+    if title == 'BVP':
+        plt.axvline(x=0.6 * 60, color='g', linestyle='--',
+                    label='Min HR (36 BPM)')
+        plt.axvline(x=3.3 * 60, color='r', linestyle='--',
+                    label='Max HR (198 BPM)')
+    elif title == 'Respiratory':
+        plt.axvline(x=0.1 * 60, color='g', linestyle='--',
+                    label='Min RR (6 breaths/min)')
+        plt.axvline(x=0.54 * 60, color='r', linestyle='--',
+                    label='Max RR (32 breaths/min)')
+
+    plt.legend()
+
+    # Save plot
+    output_dir = os.path.dirname(file_path)
+    output_file = os.path.join(
+        output_dir, f'{title.lower()}_frequency_spectrum.png')
+    plt.savefig(output_file)
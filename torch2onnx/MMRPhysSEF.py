@@ -4,6 +4,7 @@ MMRPhys: Remote Extraction of Multiple Physiological Signals
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 
 nf_BVP = [8, 12, 16]
 nf_RSP = [16, 16, 16]
@@ -31,16 +32,12 @@ class ConvBlock3D(nn.Module):
         self.norm = nn.InstanceNorm3d(
             out_channel, track_running_stats=False, affine=True)
 
-        # Initialize in eval mode
-        self.train(False)
-        self.norm.train(False)
-
     def forward(self, x):
-        x = self.conv(x)
-        x = self.tanh(x)
-        with torch.no_grad():
-            x = self.norm(x)
-        return x
+        # Call the functional ops directly so the block traces to a single
+        # Conv -> Tanh -> InstanceNormalization chain with no module dispatch
+        x = torch.tanh(self.conv(x))
+        return F.instance_norm(x, weight=self.norm.weight, bias=self.norm.bias,
+                               use_input_stats=True, eps=self.norm.eps)
 
 class BVP_FeatureExtractor(nn.Module):
     def __init__(self, inCh, dropout_rate=0.1, debug=False):
@@ -131,6 +128,8 @@ class RSP_Head(nn.Module):
 
         self.final_layer = nn.Sequential(
             ConvBlock3D(inC, nf_RSP[1], [3, 3, 3], [1, 2, 2], [1, 0, 0], dilation=[1, 1, 1]),       #B, nf_RSP[1], T//4, 4, 4
+            # Not run in forward (folded into _upsample_conv); kept so the
+            # Sequential indices and checkpoint keys stay unchanged
             nn.Upsample(scale_factor=(self.temporal_scale_factor, 1, 1)),                           #B, nf_RSP[2], T//1, 4, 4
             nn.Conv3d(nf_RSP[0], 1, (3, 4, 4), stride=(1, 1, 1), padding=(1, 0, 0), bias=False),    #B, 1, T//1, 1, 1
         )
@@ -138,11 +137,53 @@ class RSP_Head(nn.Module):
     def forward(self, length, rsp_embeddings=None):
 
         voxel_embeddings = self.conv_block(rsp_embeddings)
-        x = self.final_layer(voxel_embeddings)
-        rBr = x.view(-1, length)
+        x = self.final_layer[0](voxel_embeddings)
+        x = self._upsample_conv(x)
+        # Phases are channels, so frame order is (T//4, scale) after transpose
+        rBr = x.transpose(1, 2).reshape(-1, length)
         
         return rBr
 
+    def _upsample_conv(self, x):
+        """Equivalent of final_layer[1:] (nearest temporal Upsample + Conv3d)
+        computed without materialising the upsampled tensor.
+
+        Output frame scale*t + r of the conv only sees input frames within
+        ceil(pad / scale) of t, so each phase r is a plain conv on x whose
+        temporal taps are sums of the original taps. Returns
+        [B, scale, T//4, H', W'] with phase r in channel r.
+        """
+        upsample, conv = self.final_layer[1], self.final_layer[2]
+        scale = self.temporal_scale_factor
+        k_t, pad_t = conv.kernel_size[0], conv.padding[0]
+
+        # The folding below relies on these settings of the original layers
+        assert upsample.mode == 'nearest'
+        assert tuple(upsample.scale_factor) == (scale, 1, 1)
+        assert conv.out_channels == 1 and conv.groups == 1
+        assert conv.padding_mode == 'zeros'
+        assert conv.stride[0] == 1 and conv.dilation[0] == 1
+        assert 2 * pad_t == k_t - 1  # output length equals upsampled length
+
+        # Input frames t - reach .. t + reach contribute to output frames of t
+        reach = -(-pad_t // scale)
+        weight = conv.weight[0]  # single output channel: [C, kT, kH, kW]
+
+        phases = []
+        for r in range(scale):
+            taps = [torch.zeros_like(weight[:, 0]) for _ in range(2 * reach + 1)]
+            for k in range(k_t):
+                tap = (r + k - pad_t) // scale + reach
+                taps[tap] = taps[tap] + weight[:, k]
+            phases.append(torch.stack(taps, dim=1))
+        fused = torch.stack(phases, dim=0)  # [scale, C, 2*reach+1, kH, kW]
+        bias = None if conv.bias is None else conv.bias.expand(scale)
+
+        return F.conv3d(x, fused, bias,
+                        stride=(1,) + tuple(conv.stride[1:]),
+                        padding=(reach,) + tuple(conv.padding[1:]),
+                        dilation=(1,) + tuple(conv.dilation[1:]))
+
 
 class MMRPhysSEF(nn.Module):
     def __init__(self, frames, md_config, in_channels=4, dropout=0.2, device=torch.device("cpu"), debug=False):
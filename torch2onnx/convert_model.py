@@ -22,6 +22,8 @@ def main():
     parser.add_argument('--num_channels', type=int, default=3)
     parser.add_argument('--height', type=int, default=9)
     parser.add_argument('--width', type=int, default=9)
+    parser.add_argument('--fp16', action='store_true', default=False,
+                        help='Convert the exported model to float16 (float32 IO)')
     parser.add_argument('--verbose', action='store_true', default=False,
                         help='Enable verbose logging')
 
@@ -48,7 +50,8 @@ def main():
             num_frames=args.num_frames,
             num_channels=args.num_channels,
             height=args.height,
-            width=args.width
+            width=args.width,
+            fp16=args.fp16
         )
 
         # Perform conversion
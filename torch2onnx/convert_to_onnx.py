@@ -13,7 +13,7 @@ logger = logging.getLogger(__name__)
 
 class OnnxConverter:
     def __init__(self, model_path, onnx_path, config_path, num_frames=181,
-                 num_channels=3, height=9, width=9):
+                 num_channels=3, height=9, width=9, fp16=False):
         self.model_path = Path(model_path)
         self.onnx_path = Path(onnx_path)
         self.config_path = Path(config_path)
@@ -21,6 +21,7 @@ class OnnxConverter:
         self.num_channels = num_channels
         self.height = height
         self.width = width
+        self.fp16 = fp16
         self.device = torch.device(
             "cuda" if torch.cuda.is_available() else "cpu")
 
@@ -30,6 +31,13 @@ class OnnxConverter:
         # Initialize model
         self.model = self._initialize_model()
 
+        # Dummy input used to trace the model during export
+        self.dummy_input = torch.randn(
+            1, self.num_channels, self.num_frames,
+            self.height, self.width,
+            requires_grad=False
+        ).to(self.device)
+
     def _load_or_create_config(self):
         """Load or create model configuration"""
         if self.config_path.exists():
@@ -111,13 +119,6 @@ class OnnxConverter:
             # Ensure eval mode
             self._force_eval_mode()
 
-            # Create dummy input
-            dummy_input = torch.randn(
-                1, self.num_channels, self.num_frames,
-                self.height, self.width,
-                requires_grad=False
-            ).to(self.device)
-
             # Define dynamic axes
             dynamic_axes = {
                 'input': {0: 'batch_size', 2: 'frames'},
@@ -125,29 +126,43 @@ class OnnxConverter:
                 'rRSP': {0: 'batch_size', 2: 'frames'}
             }
 
-            # Export to ONNX
-            torch.onnx.export(
-                self.model,
-                dummy_input,
-                self.onnx_path,
-                export_params=True,
-                opset_version=14,
-                do_constant_folding=True,
-                input_names=['input'],
-                output_names=['rPPG', 'rRSP'],
-                dynamic_axes=dynamic_axes,
-                verbose=True,
-                training=torch.onnx.TrainingMode.EVAL,
-                keep_initializers_as_inputs=False
-            )
+            # Export to ONNX; autograd is disabled once here rather than
+            # inside every block's forward
+            with torch.inference_mode():
+                torch.onnx.export(
+                    self.model,
+                    self.dummy_input,
+                    self.onnx_path,
+                    export_params=True,
+                    opset_version=17,
+                    dynamo=False,
+                    do_constant_folding=True,
+                    input_names=['input'],
+                    output_names=['rPPG', 'rRSP'],
+                    dynamic_axes=dynamic_axes,
+                    verbose=logger.isEnabledFor(logging.DEBUG),
+                    training=torch.onnx.TrainingMode.EVAL,
+                    keep_initializers_as_inputs=False
+                )
 
             logger.info(f"Model exported to {self.onnx_path}")
+            if self.fp16:
+                self._convert_to_fp16()
             self._verify_onnx()
 
         except Exception as e:
             logger.error(f"Error during conversion: {str(e)}")
             raise
 
+    def _convert_to_fp16(self):
+        """Store weights and activations in float16, keeping float32 IO"""
+        from onnxconverter_common import float16
+
+        model = onnx.load(self.onnx_path)
+        model = float16.convert_float_to_float16(model, keep_io_types=True)
+        onnx.save(model, self.onnx_path)
+        logger.info(f"Converted {self.onnx_path} to float16")
+
     def _verify_onnx(self):
         """Verify the exported ONNX model"""
         try:
@@ -156,12 +171,13 @@ class OnnxConverter:
             logger.info("ONNX model verification passed")
 
             # Print model graph
-            logger.info("\nONNX Model Graph:")
-            for node in model.graph.node:
-                logger.info(f"Op Type: {node.op_type}")
-                logger.info(f"Inputs: {node.input}")
-                logger.info(f"Outputs: {node.output}")
-                logger.info("---")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("\nONNX Model Graph:")
+                for node in model.graph.node:
+                    logger.debug(f"Op Type: {node.op_type}")
+                    logger.debug(f"Inputs: {node.input}")
+                    logger.debug(f"Outputs: {node.output}")
+                    logger.debug("---")
 
         except Exception as e:
             logger.error(f"ONNX verification failed: {str(e)}")
@@ -179,6 +195,7 @@ if __name__ == "__main__":
     parser.add_argument('--num_channels', type=int, default=3)
     parser.add_argument('--height', type=int, default=9)
     parser.add_argument('--width', type=int, default=9)
+    parser.add_argument('--fp16', action='store_true', default=False)
 
     args = parser.parse_args()
 
@@ -189,6 +206,7 @@ if __name__ == "__main__":
         args.num_frames,
         args.num_channels,
         args.height,
-        args.width
+        args.width,
+        args.fp16
     )
     converter.convert()
@@ -10,112 +10,254 @@
     conv_block_3d.2.running_var  -> not used
 """
 
+import os
+import re
+import sys
+import json
 import torch
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Old ConvBlock3D keys: "<base.>conv_block_3d.<layer_idx>.<param>"
+_CONV_BLOCK_RE = re.compile(r'^((?:.*\.)?)conv_block_3d\.(\d+)\.(\w+)$')
+
+# remap lookup result for keys the table does not cover
+_NOT_IN_REMAP = object()
+
+# Below this many elements, dtype casts are cheaper than thread hand-offs
+_PARALLEL_CAST_NUMEL = 1 << 24
+
+
+def _cast_floats(state_dict, dtype):
+    """Casts the floating point tensors of state_dict to dtype in place
+
+    Casts release the GIL, so large checkpoints are cast on a thread pool.
+    """
+    keys = [key for key, value in state_dict.items() if value.is_floating_point()]
+
+    def cast(key):
+        return state_dict[key].to(dtype)
+
+    if sum(state_dict[key].numel() for key in keys) < _PARALLEL_CAST_NUMEL:
+        state_dict.update((key, cast(key)) for key in keys)
+        return
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        state_dict.update(zip(keys, executor.map(cast, keys)))
+
 
 class WeightMapper:
     @staticmethod
-    def map_weights(old_state_dict):
-        """Maps weights from old Sequential ConvBlock3D to new implementation"""
-        new_state_dict = OrderedDict()
+    def build_remap(new_model):
+        """Builds the old -> new key table for every ConvBlock3D in new_model
+
+        Keys are without the 'module.' prefix; keys that map to None (the old
+        norm's running stats) are dropped.
+        """
+        remap = {}
+        for name, module in new_model.named_modules():
+            conv = getattr(module, 'conv', None)
+            norm = getattr(module, 'norm', None)
+            if not (isinstance(conv, torch.nn.Conv3d)
+                    and isinstance(norm, torch.nn.InstanceNorm3d)):
+                continue
+            prefix = f"{name}." if name else ''
+            old = f"{prefix}conv_block_3d."
+            for param_name, _ in conv.named_parameters():
+                remap[f"{old}0.{param_name}"] = f"{prefix}conv.{param_name}"
+            for param_name, _ in norm.named_parameters():
+                remap[f"{old}2.{param_name}"] = f"{prefix}norm.{param_name}"
+            for stat in ('running_mean', 'running_var', 'num_batches_tracked'):
+                remap[f"{old}2.{stat}"] = None
+        return remap
+
+    @staticmethod
+    def map_weights(old_state_dict, consume=False, dtype=None, remap=None):
+        """Maps weights from old Sequential ConvBlock3D to new implementation
+
+        remap is an optional table from build_remap; keys it covers are
+        mapped with one lookup, anything else goes through the generic
+        conv_block_3d rule. With consume=True entries are popped from old_state_dict as they are
+        mapped, so skipped tensors are released as soon as they are seen.
+        If dtype is given, the mapped floating point tensors are cast to it
+        (see _cast_floats); integer tensors are left as they are.
+
+        Returns (new_state_dict, unused_keys), where unused_keys lists the
+        original keys that were dropped. A checkpoint that is already in the
+        new layout is returned without rebuilding (as-is when consume=True,
+        otherwise as a shallow copy).
+        """
+        if not any(key.startswith('module.') or 'conv_block_3d' in key
+                   or 'fsam' in key or 'bias1' in key for key in old_state_dict):
+            new_state_dict = old_state_dict if consume else dict(old_state_dict)
+            if dtype is not None:
+                _cast_floats(new_state_dict, dtype)
+            return new_state_dict, []
+
+        new_state_dict = {}
+        unused_keys = []
+
+        if consume:
+            items = ((key, old_state_dict.pop(key)) for key in list(old_state_dict))
+        else:
+            items = old_state_dict.items()
 
-        for key, value in old_state_dict.items():
-            # Handle module prefix
-            if key.startswith('module.'):
-                key = key[7:]  # remove 'module.' prefix
+        for old_key, value in items:
+            # Handle module prefix; unprefixed keys are returned as-is
+            key = old_key.removeprefix('module.')
 
             # Skip unnecessary weights
-            if any(skip in key for skip in ['fsam', 'bias1']):
-                logger.info(f"Skipping unnecessary weight: {key}")
+            if 'fsam' in key or 'bias1' in key:
+                logger.info("Skipping unnecessary weight: %s", key)
+                unused_keys.append(old_key)
                 continue
 
-            # Map ConvBlock3D weights
-            if 'conv_block_3d' in key:
-                new_key = WeightMapper._map_conv_block_key(key)
-                if new_key:
-                    new_state_dict[new_key] = value
+            if remap is not None:
+                new_key = remap.get(key, _NOT_IN_REMAP)
             else:
-                new_state_dict[key] = value
+                new_key = _NOT_IN_REMAP
 
-        return new_state_dict
+            if new_key is _NOT_IN_REMAP:
+                match = _CONV_BLOCK_RE.match(key)
+                if match is None:
+                    new_key = key
+                else:
+                    # Map ConvBlock3D weights based on layer index
+                    base, layer_idx, param_name = match.groups()
+                    if layer_idx == '0':  # Conv layer
+                        new_key = f"{base}conv.{param_name}"
+                    # InstanceNorm layer
+                    elif layer_idx == '2' and param_name in ('weight', 'bias'):
+                        new_key = f"{base}norm.{param_name}"
+                    else:
+                        new_key = None  # Skip Tanh layer and running stats
 
-    @staticmethod
-    def _map_conv_block_key(key):
-        """Maps individual ConvBlock3D keys"""
-        parts = key.split('.')
-        layer_idx = int(parts[-2])
-        param_name = parts[-1]
-        base_name = '.'.join(parts[:-3]) if len(parts) > 3 else ''
-
-        # Map based on layer index
-        if layer_idx == 0:  # Conv layer
-            component = 'conv'
-        # InstanceNorm layer
-        elif layer_idx == 2 and param_name in ['weight', 'bias']:
-            component = 'norm'
-        else:
-            return None  # Skip Tanh layer and running stats
+            if new_key is None:
+                unused_keys.append(old_key)
+                continue
+            # Interned so repeated mappings of a checkpoint share key objects
+            new_state_dict[sys.intern(new_key)] = value
 
-        return f"{base_name}.{component}.{param_name}" if base_name else f"{component}.{param_name}"
+        if dtype is not None:
+            _cast_floats(new_state_dict, dtype)
+
+        return new_state_dict, unused_keys
 
     @staticmethod
-    def verify_mapping(new_model, old_state_dict, new_state_dict):
-        """Verifies weight mapping correctness"""
-        logger.info("\nVerifying weight mapping...")
-
-        # Check model parameters
-        for name, param in new_model.named_parameters():
-            if name not in new_state_dict:
-                logger.warning(f"Missing weight: {name}")
-            elif param.shape != new_state_dict[name].shape:
-                logger.error(
-                    f"Shape mismatch for {name}: expected {param.shape}, got {new_state_dict[name].shape}")
+    def verify_mapping(param_shapes, unused_keys, new_state_dict):
+        """Verifies weight mapping correctness
+
+        param_shapes maps the target model's parameter names to their shapes;
+        unused_keys are the checkpoint keys map_weights dropped.
+        """
+        logger.info("Verifying weight mapping...")
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        # Check model parameters with one shape lookup each; only problems
+        # are logged individually
+        shapes = {key: value.shape for key, value in new_state_dict.items()}
+        absent = object()
+        ok = missing = mismatched = 0
+        for name, expected in param_shapes.items():
+            shape = shapes.get(name, absent)
+            if shape is absent:
+                missing += 1
+                logger.warning("Missing weight: %s", name)
+            elif expected != shape:
+                mismatched += 1
+                logger.error("Shape mismatch for %s: expected %s, got %s",
+                             name, expected, shape)
             else:
-                logger.info(f"✓ {name}: Shape {param.shape}")
+                ok += 1
+                if debug:
+                    logger.debug("✓ %s: Shape %s", name, expected)
+        logger.info("Verified %d parameters: %d missing, %d shape-mismatched",
+                    ok, missing, mismatched)
 
-        # Check for unused weights
-        original_keys = set(old_state_dict.keys())
-        mapped_keys = set(new_state_dict.keys())
-        unused = original_keys - mapped_keys
-        if unused:
-            logger.info("\nUnused weights from original state dict:")
-            for key in unused:
-                logger.info(f"- {key}")
+        # Report unused weights
+        if unused_keys:
+            logger.info("%d unused weights in original state dict",
+                        len(unused_keys))
+            if debug:
+                for key in unused_keys:
+                    logger.debug("- %s", key)
 
 
-def convert_weights(model_path, new_model):
-    """Converts weights from old format to new format"""
-    try:
-        # Load state dict
-        state_dict = torch.load(model_path, map_location='cpu')
+def convert_weights(model_path, new_model, assign=False, dtype=None, verify=False):
+    """Converts weights from old format to new format
 
-        # Map weights
-        mapper = WeightMapper()
-        new_state_dict = mapper.map_weights(state_dict)
+    By default the loaded tensors are copied into new_model's parameters, so
+    the model keeps its own dtype. With assign=True the model adopts the
+    loaded tensors (dtype included) instead, which lets new_model live on the
+    meta device. dtype optionally casts the floating point weights while mapping.
+    verify=True runs verify_mapping before loading. Missing and unexpected
+    keys are reported after loading either way; missing parameters already
+    reported by verify_mapping are not listed again.
+    """
+    # Load state dict; mmap keeps the storages file-backed so tensors are
+    # paged in on demand instead of being copied into RAM up front
+    state_dict = torch.load(model_path, map_location='cpu',
+                            mmap=True, weights_only=True)
+    # Training checkpoints may wrap the weights alongside optimizer state
+    state_dict = state_dict.get('state_dict', state_dict)
 
-        # Verify mapping
-        mapper.verify_mapping(new_model, state_dict, new_state_dict)
+    # Map weights, releasing the original entries as they are consumed
+    mapper = WeightMapper()
+    new_state_dict, unused_keys = mapper.map_weights(
+        state_dict, consume=True, dtype=dtype,
+        remap=mapper.build_remap(new_model))
 
-        # Load weights into model
-        missing, unexpected = new_model.load_state_dict(
-            new_state_dict, strict=False)
+    # Verify mapping
+    param_shapes = {}
+    if verify:
+        param_shapes = {name: param.shape
+                        for name, param in new_model.named_parameters()}
+        mapper.verify_mapping(param_shapes, unused_keys, new_state_dict)
 
-        # Report results
-        if missing:
-            logger.warning(f"Missing keys: {missing}")
-        if unexpected:
-            logger.warning(f"Unexpected keys: {unexpected}")
+    # Load weights into model; with assign the loaded tensors are adopted
+    # rather than copied into the freshly initialised parameters
+    # (mmap loading and assign both need torch >= 2.1)
+    missing, unexpected = new_model.load_state_dict(
+        new_state_dict, strict=False, assign=assign)
 
-        return new_state_dict
+    # Report results (verify_mapping has already warned about parameters)
+    missing = [key for key in missing if key not in param_shapes]
+    if missing:
+        logger.warning("Missing keys: %s", missing)
+    if unexpected:
+        logger.warning("Unexpected keys: %s", unexpected)
 
-    except Exception as e:
-        logger.error(f"Error converting weights: {str(e)}")
-        raise
+    return new_state_dict
+
+
+def save_state_dict(state_dict, save_path):
+    """Saves a state dict, as safetensors if save_path ends in .safetensors
+
+    safetensors files are a header plus flat tensor data, so they can be
+    loaded with safetensors.torch.load_file (memory-mapped, no unpickling).
+    Any other extension is written with torch.save.
+    """
+    if str(save_path).endswith('.safetensors'):
+        from safetensors.torch import save_file
+        save_file({key: value.contiguous() for key, value in state_dict.items()},
+                  str(save_path))
+    else:
+        torch.save(state_dict, save_path)
+
+
+def write_index(state_dict, save_path):
+    """Writes save_path + '.index.json' describing every saved tensor
+
+    Maps each key to its dtype, shape and size in bytes, so a loader can set
+    up a (meta) model or select tensors without opening the checkpoint.
+    """
+    index = {key: {'dtype': str(value.dtype).replace('torch.', ''),
+                   'shape': list(value.shape),
+                   'bytes': value.numel() * value.element_size()}
+             for key, value in state_dict.items()}
+    with open(f"{save_path}.index.json", 'w') as f:
+        json.dump(index, f, indent=2)
 
 
 if __name__ == "__main__":
@@ -124,10 +266,31 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument('--model_path', type=str, required=True)
     parser.add_argument('--save_path', type=str, required=True)
+    parser.add_argument('--dtype', choices=['fp32', 'fp16', 'bf16'], default=None,
+                        help='Cast floating point weights before saving')
+    parser.add_argument('--verify', action='store_true', default=False,
+                        help='Check the mapped weights against the model')
+    parser.add_argument('--index', action='store_true', default=False,
+                        help='Also write <save_path>.index.json')
     args = parser.parse_args()
 
+    # Configure logging only when run as a script; importers keep their own
+    logging.basicConfig(level=logging.INFO)
+    dtype = {'fp32': torch.float32, 'fp16': torch.float16,
+             'bf16': torch.bfloat16}.get(args.dtype)
+
     from MMRPhysSEF import MMRPhysSEF
-    model = MMRPhysSEF(frames=300, md_config={
-                       "TASKS": ["BVP", "RSP"], "FS": 30}, in_channels=3)
-    new_state_dict = convert_weights(args.model_path, model)
-    torch.save(new_state_dict, args.save_path)
+    # Build on the meta device: parameters only need shapes here, the data
+    # comes from the checkpoint
+    with torch.device('meta'):
+        model = MMRPhysSEF(frames=300, md_config={
+                           "TASKS": ["BVP", "RSP"], "FS": 30}, in_channels=3)
+    try:
+        new_state_dict = convert_weights(args.model_path, model, assign=True,
+                                         dtype=dtype, verify=args.verify)
+    except Exception:
+        logger.exception("Error converting weights")
+        raise SystemExit(1)
+    save_state_dict(new_state_dict, args.save_path)
+    if args.index:
+        write_index(new_state_dict, args.save_path)